@@ -1,7 +1,7 @@
 import os
 
 DATA_DIR = "data"
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
+os.makedirs(DATA_DIR, exist_ok=True)
 
 DATA_FILE = os.path.join(DATA_DIR, "assistant_data.json")
+DATA_BIN_FILE = os.path.join(DATA_DIR, "assistant_data.mp")
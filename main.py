@@ -1,12 +1,59 @@
 # -*- coding: utf-8 -*-
 import json
 import functools
+import os
 import sys
 
-from config import DATA_FILE
-from notes import Note, NoteBook
+try:
+    import orjson
+except ImportError:  # orjson не встановлено — працюємо на стандартному json
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # без msgpack дані зберігаються лише в JSON
+    msgpack = None
+
+from config import DATA_BIN_FILE, DATA_FILE
+from notes import LazyNoteBook, Note, NoteBook
 from models import AddressBook, Record
 
+_HELP_TEXT = (
+    "Доступні команди:\n"
+    "\n"
+    "Контакти:\n"
+    "  add <ім'я> [телефон] [email] [address] - Додати контакт або доповнити\n"
+    "  change <ім'я> phone <старий> <новий>   - Змінити телефон\n"
+    "  delete-contact <ім'я>                  - Видалити контакт\n"
+    "  find-contact <запит>                   - Пошук по імені/тел/емейл/адресі\n"
+    "  phone <ім'я>                           - Показати телефони контакту\n"
+    "  all                                    - Показати всі контакти\n"
+    "\n"
+    "Email:\n"
+    "  add-email <ім'я> <email>               - Додати email\n"
+    "  change <ім'я> email <new_email>        - Змінити email\n"
+    "\n"
+    "Адреси:\n"
+    "  add-address <ім'я> <address>           - Додати адресу\n"
+    "  change <ім'я> address <new address>    - Змінити адресу\n"
+    "\n"
+    "Дні народження:\n"
+    "  add-birthday <ім'я> <дата>             - Додати день народження\n"
+    "  show-birthday <ім'я>                   - Показати день народження\n"
+    "  birthdays [днів]                       - Показати дні народження в найближчі N днів\n"
+    "\n"
+    "Нотатки:\n"
+    "  add-note <текст>                       - Додати нотатку\n"
+    "  show-notes                              - Показати всі нотатки\n"
+    "  find-notes <запит>                      - Пошук нотаток\n"
+    "  edit-note <ID> <новий текст>           - Редагувати нотатку\n"
+    "  delete-note <ID>                        - Видалити нотатку\n"
+    "\n"
+    "Системні:\n"
+    "  help                                   - Показати це меню\n"
+    "  exit / close                           - Вийти з програми\n"
+)
+
 
 def input_error(func):
     @functools.wraps(func)
@@ -26,10 +73,9 @@ def input_error(func):
 
 
 def parse_input(user_input):
-    parts = user_input.split()
-    cmd = parts[0].lower()
-    args = parts[1:]
-    return cmd, args
+    # Відділяємо лише команду; решту ділимо на аргументи, тільки якщо вона є
+    cmd, *rest = user_input.split(maxsplit=1)
+    return cmd.lower(), rest[0].split() if rest else []
 
 
 @input_error
@@ -43,7 +89,8 @@ def add_contact(args, book: AddressBook):
     rest = args[1:]
     addr_parts = []
     for token in rest:
-        if not phone and token.isdigit() and len(token) == 10:
+        if (not phone and len(token) == 10
+                and token.isascii() and token.isdigit()):
             phone = token
             continue
         if not email and "@" in token and "." in token:
@@ -51,7 +98,7 @@ def add_contact(args, book: AddressBook):
             continue
         addr_parts.append(token)
     if addr_parts:
-        address = " ".join(addr_parts) if addr_parts else None
+        address = " ".join(addr_parts)
     record = book.find(name)
     message = "Contact updated."
     if record is None:
@@ -97,13 +144,13 @@ def change_contact(args, book: AddressBook):
 def show_phone(args, book: AddressBook):
     name, *_ = args
     record = book.find(name)
-    return '; '.join(p.value for p in record.phones)
+    return '; '.join(record.phones)
 
 
 def show_all(_, book: AddressBook):
-    if not book.data:
+    if not book:
         return "No contacts found."
-    return "\n".join(str(record) for record in book.data.values())
+    return "\n".join(str(record) for record in book.values())
 
 
 @input_error
@@ -119,7 +166,7 @@ def show_birthday(args, book: AddressBook):
     name, *_ = args
     record = book.find(name)
     if record.birthday:
-        return record.birthday.value.strftime('%d.%m.%Y')
+        return str(record.birthday)
     return "Birthday not set for this contact."
 
 
@@ -197,9 +244,9 @@ def add_note(args, notebook: NoteBook):
 
 
 def show_notes(_, notebook: NoteBook):
-    if not notebook.data:
+    if not notebook:
         return "No notes found."
-    return "\n".join(str(note) for note in notebook.data.values())
+    return "\n".join(str(note) for note in notebook.values())
 
 
 @input_error
@@ -242,21 +289,117 @@ def delete_note(args, notebook: NoteBook):
     return notebook.delete_note(note_id)
 
 
+def _encode(obj):
+    """default-хук серіалізаторів: записи й нотатки перетворюються по одному
+    під час запису, без повної копії книги у dict"""
+    if isinstance(obj, LazyNoteBook):
+        obj = obj.unwrap()
+        if not isinstance(obj, NoteBook):
+            return obj  # сирі дані нотаток, які так і не відкривали
+    if isinstance(obj, NoteBook):
+        return {
+            "next_id": obj.next_id,
+            "notes": {str(k): v for k, v in obj.items()},
+        }
+    if isinstance(obj, (Record, Note)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data, default=_encode, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, default=_encode, indent=4).encode("utf-8")
+
+
+def _loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _write_atomic(path, payload):
+    # Пишемо в тимчасовий файл і підміняємо ним основний, щоб перерваний
+    # запис (Ctrl+C, збій) не залишив напівзаписаний файл даних
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
 def save_data(book, notebook):
+    # Моделі серіалізуються через _encode, без проміжного to_dict() усієї книги
     data = {
-        "contacts": book.to_dict(),
-        "notes": notebook.to_dict(),
+        "contacts": book,
+        # NoteBook — теж dict, тож сам серіалізатор не додав би next_id
+        "notes": _encode(notebook),
     }
 
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    # JSON пишемо завжди: його читають запуски без msgpack і люди
+    _write_atomic(DATA_FILE, _dumps(data))
+    if msgpack is not None:
+        # .mp запам'ятовує, з яким саме JSON його записали
+        data["json_stamp"] = _json_stamp()
+        packed = msgpack.packb(data, default=_encode, use_bin_type=True)
+        _write_atomic(DATA_BIN_FILE, packed)
+    else:
+        # Старий .mp більше не відповідає JSON — прибираємо його
+        try:
+            os.remove(DATA_BIN_FILE)
+        except FileNotFoundError:
+            pass
+
+
+def _json_stamp():
+    """Розмір і час зміни JSON-файлу або None, якщо його немає"""
+    try:
+        stat = os.stat(DATA_FILE)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _read_bin_data():
+    """Дані з .mp або None, якщо msgpack немає чи файл відсутній/пошкоджений"""
+    if msgpack is None:
+        return None
+    try:
+        with open(DATA_BIN_FILE, "rb") as f:
+            data = msgpack.unpackb(f.read(), raw=False)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, msgpack.UnpackException):
+        data = None
+    if not isinstance(data, dict):
+        print(f"Warning: {DATA_BIN_FILE} is damaged, using {DATA_FILE}",
+              file=sys.stderr)
+        return None
+    return data
+
+
+def _read_data():
+    bin_data = _read_bin_data()
+    # .mp беремо, лише якщо JSON відтоді не змінювали (запуск без msgpack,
+    # відновлення з копії, ручне редагування)
+    if bin_data is not None and bin_data.get("json_stamp") == _json_stamp():
+        return bin_data
+
+    try:
+        with open(DATA_FILE, "rb") as f:
+            return _loads(f.read())
+    except (OSError, ValueError):
+        # JSON відсутній або пошкоджений — краще вже дані з .mp, ніж нічого
+        if bin_data is not None:
+            return bin_data
+        raise
 
 
 def load_data():
     try:
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        data = _read_data()
+    except (FileNotFoundError, ValueError):
         # если файла нет или он битый — создаём пустые структуры
         return AddressBook(), NoteBook()
 
@@ -264,47 +407,35 @@ def load_data():
     notes_data = data.get("notes", {})
 
     book = AddressBook.from_dict(book_data)
-    notebook = NoteBook.from_dict(notes_data)
+    # Нотатки розбираємо лише тоді, коли користувач звернеться до них
+    notebook = LazyNoteBook(notes_data)
 
     return book, notebook
 
 
 def help_command(*args):
-    return (
-        "Доступні команди:\n"
-        "\n"
-        "Контакти:\n"
-        "  add <ім'я> [телефон] [email] [address] - Додати контакт або доповнити\n"
-        "  change <ім'я> phone <старий> <новий>   - Змінити телефон\n"
-        "  delete-contact <ім'я>                  - Видалити контакт\n"
-        "  find-contact <запит>                   - Пошук по імені/тел/емейл/адресі\n"
-        "  phone <ім'я>                           - Показати телефони контакту\n"
-        "  all                                    - Показати всі контакти\n"
-        "\n"
-        "Email:\n"
-        "  add-email <ім'я> <email>               - Додати email\n"
-        "  change <ім'я> email <new_email>        - Змінити email\n"
-        "\n"
-        "Адреси:\n"
-        "  add-address <ім'я> <address>           - Додати адресу\n"
-        "  change <ім'я> address <new address>    - Змінити адресу\n"
-        "\n"
-        "Дні народження:\n"
-        "  add-birthday <ім'я> <дата>             - Додати день народження\n"
-        "  show-birthday <ім'я>                   - Показати день народження\n"
-        "  birthdays [днів]                       - Показати дні народження в найближчі N днів\n"
-        "\n"
-        "Нотатки:\n"
-        "  add-note <текст>                       - Додати нотатку\n"
-        "  show-notes                              - Показати всі нотатки\n"
-        "  find-notes <запит>                      - Пошук нотаток\n"
-        "  edit-note <ID> <новий текст>           - Редагувати нотатку\n"
-        "  delete-note <ID>                        - Видалити нотатку\n"
-        "\n"
-        "Системні:\n"
-        "  help                                   - Показати це меню\n"
-        "  exit / close                           - Вийти з програми\n"
-    )
+    return _HELP_TEXT
+
+
+def read_commands(prompt):
+    """Рядки команд: input() у терміналі, пряме читання sys.stdin у конвеєрі"""
+    if sys.stdin.isatty():
+        while True:
+            try:
+                yield input(prompt)
+            except EOFError:
+                return
+
+    # Для скриптів/конвеєрів читаємо stdin напряму; prompt показуємо до
+    # очікування рядка, бо без TTY (консоль IDE, mintty) теж може вводити
+    # людина
+    while True:
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        line = sys.stdin.readline()
+        if not line:
+            return
+        yield line.rstrip("\n")
 
 
 def main():
@@ -318,40 +449,40 @@ def main():
     greet = "Welcome to the assistant bot! Enter help to see commands"
     command_map = {
         "hello": lambda *_: greet,
-        "add": add_contact,
-        "change": change_contact,
-        "phone": show_phone,
-        "all": lambda args, book: show_all(args, book),
-        "add-birthday": add_birthday,
-        "show-birthday": show_birthday,
-        "birthdays": lambda args, book: birthdays(args, book),
-        "add-note": lambda args, book: add_note(args, notebook),
-        "show-notes": lambda args, book: show_notes(args, notebook),
-        "find-notes": lambda args, book: find_notes(args, notebook),
-        "edit-note": lambda args, book: edit_note(args, notebook),
-        "delete-note": lambda args, book: delete_note(args, notebook),
-        "help": lambda args, book: help_command(),
-        "add-email": lambda args, book: add_email(args, book),
-        "add-address": lambda args, book: add_address(args, book),
-        "delete-contact": lambda args, book: delete_contact(args, book),
-        "find-contact": lambda args, book: find_contact(args, book),
+        "add": functools.partial(add_contact, book=book),
+        "change": functools.partial(change_contact, book=book),
+        "phone": functools.partial(show_phone, book=book),
+        "all": functools.partial(show_all, book=book),
+        "add-birthday": functools.partial(add_birthday, book=book),
+        "show-birthday": functools.partial(show_birthday, book=book),
+        "birthdays": functools.partial(birthdays, book=book),
+        "add-note": functools.partial(add_note, notebook=notebook),
+        "show-notes": functools.partial(show_notes, notebook=notebook),
+        "find-notes": functools.partial(find_notes, notebook=notebook),
+        "edit-note": functools.partial(edit_note, notebook=notebook),
+        "delete-note": functools.partial(delete_note, notebook=notebook),
+        "help": help_command,
+        "add-email": functools.partial(add_email, book=book),
+        "add-address": functools.partial(add_address, book=book),
+        "delete-contact": functools.partial(delete_contact, book=book),
+        "find-contact": functools.partial(find_contact, book=book),
     }
 
     print("Welcome to the assistant bot!")
-    while True:
-        user_input = input("Enter a command: ")
-        if not user_input:
+    for user_input in read_commands("Enter a command: "):
+        if not user_input or user_input.isspace():
             continue
         command, args = parse_input(user_input)
 
-        if command in ["close", "exit"]:
-            print("Good bye!")
-            save_data(book, notebook)
+        if command in ("close", "exit"):
             break
-        elif command in command_map:
-            print(command_map[command](args, book))
-        else:
-            print("Invalid command.")
+        # Один пошук у словнику замість перевірки "in" і повторного [command]
+        handler = command_map.get(command)
+        print(handler(args) if handler is not None else "Invalid command.")
+
+    # Виходимо по exit/close або коли закінчився вхідний потік
+    print("Good bye!")
+    save_data(book, notebook)
 
 
 if __name__ == "__main__":
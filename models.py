@@ -1,9 +1,15 @@
-from collections import UserDict
-from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right, insort
+from calendar import isleap
+from collections import defaultdict
+from itertools import count
+from operator import itemgetter
+from datetime import date, datetime, timedelta
 import re
 
 
 class Field:
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
@@ -12,75 +18,147 @@ class Field:
 
 
 class Name(Field):
-    pass
+    __slots__ = ()
 
 
-class Phone(Field):
-    def __init__(self, value):
-        if not (isinstance(value, str) and value.isdigit() and len(value) == 10):
-            raise ValueError("Phone number must be a 10-digit string of numbers.")
-        super().__init__(value)
+def _validate_phone(value):
+    if not (isinstance(value, str) and len(value) == 10
+            and value.isascii() and value.isdigit()):
+        raise ValueError("Phone number must be a 10-digit string of numbers.")
+    return value
 
 
-class Email(Field):
-    def __init__(self, value):
-        pattern = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-        if not re.match(pattern, value):
-            raise ValueError("Invalid email format")
-        super().__init__(value)
+_EMAIL_RE = re.compile(r"^[\w.-]+@[\w.-]+\.\w+\Z")
 
 
-class Address(Field):
-    def __init__(self, value):
-        if not value or not isinstance(value, str):
-            raise ValueError("Address must be a non-empty string")
-        super().__init__(value)
+def _validate_email(value):
+    if not _EMAIL_RE.match(value):
+        raise ValueError("Invalid email format")
+    return value
+
+
+def _validate_address(value):
+    if not value or not isinstance(value, str):
+        raise ValueError("Address must be a non-empty string")
+    return value
+
+
+def _parse_date(value):
+    """Розібрати DD.MM.YYYY; канонічний запис — без strptime"""
+    day, month, year = value[:2], value[3:5], value[6:]
+    digits = day + month + year
+    if (len(value) == 10 and value[2] == value[5] == "."
+            and digits.isascii() and digits.isdigit()):
+        return date(int(year), int(month), int(day))
+    # Інші варіанти, які приймав strptime (наприклад, 1.3.1990)
+    return datetime.strptime(value, "%d.%m.%Y").date()
+
+
+def _format_date(value):
+    """DD.MM.YYYY без strftime"""
+    return f"{value.day:02d}.{value.month:02d}.{value.year:04d}"
 
 
 class Birthday(Field):
+    __slots__ = ("_str", "_month_day")
+
     def __init__(self, value):
         try:
-            self.value = datetime.strptime(value, "%d.%m.%Y").date()
+            self.value = _parse_date(value)
         except ValueError:
             raise ValueError("Invalid date format. Use DD.MM.YYYY")
+        self._str = None
+        self._month_day = (self.value.month, self.value.day)
 
     def to_dict(self):
-        return self.value.strftime("%d.%m.%Y")
+        # Зберігаємо порядковий номер дати:
+        # завантаження — один date.fromordinal
+        return self.value.toordinal()
+
+    @classmethod
+    def _from_date(cls, value):
+        birthday = cls.__new__(cls)
+        birthday.value = value
+        birthday._str = None
+        birthday._month_day = (value.month, value.day)
+        return birthday
 
     @classmethod
-    def from_dict(cls, value_str):
-        return cls(value_str)
+    def from_ordinal(cls, ordinal):
+        return cls._from_date(date.fromordinal(ordinal))
+
+    @classmethod
+    def from_dict(cls, value):
+        if isinstance(value, int):
+            return cls.from_ordinal(value)
+        # Старий формат файлу — рядок DD.MM.YYYY;
+        # він уже валідний, тож без strptime
+        birthday = cls._from_date(
+            date(int(value[6:]), int(value[3:5]), int(value[:2]))
+        )
+        birthday._str = value
+        return birthday
 
     def __str__(self):
-        return self.value.strftime("%d.%m.%Y")
+        # Дата не змінюється, тож форматуємо її лише раз і лише за потреби
+        if self._str is None:
+            self._str = _format_date(self.value)
+        return self._str
+
+    def this_year(self, year):
+        """Дата дня народження в році year (29.02 у невисокосний — 01.03)"""
+        month, day = self._month_day
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return date(year, 3, 1)
 
 
 class Record:
+    __slots__ = (
+        "name", "phones", "_phone_index", "birthday", "email", "address",
+        "_book", "_key", "_str_cache", "_search_blob",
+    )
+
     def __init__(self, name):
         self.name = Name(name)
-        self.phones = []
+        self.phones = []  # перевірені номери як звичайні рядки
+        # номер -> скільки разів він є в phones, для швидкого find_phone
+        self._phone_index = {}
         self.birthday = None
-        self.email = None  # Буде Email об'єкт або None
-        self.address = None  # Буде Address об'єкт або None
+        self.email = None  # Рядок з перевіреним email або None
+        self.address = None  # Рядок з адресою або None
+        self._book = None  # AddressBook, у якій зараз лежить запис
+        self._key = None  # ключ запису в self._book
+        # готовий рядок для __str__, скидається при змінах
+        self._str_cache = None
+        self._search_blob = None  # текст для search, скидається при змінах
 
     def add_phone(self, phone_number):
-        self.phones.append(Phone(phone_number))
+        self.phones.append(_validate_phone(phone_number))
+        self._index_phone(phone_number)
+        self._changed()
 
     def add_birthday(self, birthday):
         if isinstance(birthday, str):
             self.birthday = Birthday(birthday)
         elif isinstance(birthday, Birthday):
             self.birthday = birthday
+        else:
+            return
+        self._changed()
 
     def set_email(self, email_str):
-        """Встановити email (створює Email об'єкт)"""
+        """Встановити email (після валідації)"""
         if email_str:
-            self.email = Email(email_str)
+            self.email = _validate_email(email_str)
+            self._changed()
 
     def set_address(self, address_str):
-        """Встановити адресу (створює Address об'єкт)"""
+        """Встановити адресу (після валідації)"""
         if address_str:
-            self.address = Address(address_str)
+            self.address = _validate_address(address_str)
+            self._changed()
 
     def edit_email(self, new_email):
         """Змінити email"""
@@ -91,139 +169,323 @@ class Record:
         self.set_address(new_address)
 
     def remove_phone(self, phone_number):
-        phone_to_remove = self.find_phone(phone_number)
-        if phone_to_remove:
-            self.phones.remove(phone_to_remove)
+        if self.find_phone(phone_number):
+            self.phones.remove(phone_number)
+            self._unindex_phone(phone_number)
+            self._changed()
         else:
             raise ValueError(f"Phone number {phone_number} not found.")
 
     def edit_phone(self, old_phone_number, new_phone_number):
-        phone_to_edit = self.find_phone(old_phone_number)
-        if phone_to_edit:
-            phone_to_edit.value = Phone(new_phone_number).value
+        if self.find_phone(old_phone_number):
+            _validate_phone(new_phone_number)
+            self.phones[self.phones.index(old_phone_number)] = new_phone_number
+            self._unindex_phone(old_phone_number)
+            self._index_phone(new_phone_number)
+            self._changed()
         else:
             raise ValueError(f"Phone number {old_phone_number} not found.")
 
     def find_phone(self, phone_number):
-        for phone in self.phones:
-            if phone.value == phone_number:
-                return phone
-        return None
+        return phone_number if phone_number in self._phone_index else None
+
+    def _index_phone(self, phone_number):
+        index = self._phone_index
+        index[phone_number] = index.get(phone_number, 0) + 1
+
+    def _unindex_phone(self, phone_number):
+        """Прибрати одне входження номера з індексу (номери повторюються)"""
+        left = self._phone_index.pop(phone_number) - 1
+        if left:
+            self._phone_index[phone_number] = left
+
+    def _changed(self):
+        """Скинути кеші і повідомити книгу, що запис змінився"""
+        self._str_cache = None
+        self._search_blob = None
+        if self._book is not None:
+            self._book._reindex(self)
+
+    def _search_text(self):
+        """Ім'я, email, адреса і телефони одним рядком у нижньому регістрі"""
+        if self._search_blob is None:
+            fields = [self.name.value]
+            if self.email:
+                fields.append(self.email)
+            if self.address:
+                fields.append(self.address)
+            fields.extend(self.phones)
+            # \x1f не вводиться з клавіатури,
+            # тож запит не "перескочить" між полями
+            self._search_blob = "\x1f".join(fields).lower()
+        return self._search_blob
 
     def __str__(self):
-        phones = f"phones: {'; '.join(p.value for p in self.phones)}" if self.phones else "phones: none"
+        if self._str_cache is None:
+            self._str_cache = self._build_str()
+        return self._str_cache
+
+    def _build_str(self):
+        if self.phones:
+            phones = f"phones: {'; '.join(self.phones)}"
+        else:
+            phones = "phones: none"
 
         birthday_info = ""
         if self.birthday:
-            birthday_str = self.birthday.value.strftime('%d.%m.%Y')
-            birthday_info = f", birthday: {birthday_str}"
+            birthday_info = f", birthday: {self.birthday}"
 
-        email_info = f", email: {self.email.value}" if self.email else ""
-        address_info = f", address: {self.address.value}" if self.address else ""
+        email_info = f", email: {self.email}" if self.email else ""
+        address_info = f", address: {self.address}" if self.address else ""
 
         return f"Contact name: {self.name.value}, {phones}{birthday_info}{email_info}{address_info}"
 
     def to_dict(self):
         return {
             "name": self.name.value,
-            "phones": [p.value for p in self.phones],
+            "phones": list(self.phones),
             "birthday": self.birthday.to_dict() if self.birthday else None,
-            "email": self.email.value if self.email else None,
-            "address": self.address.value if self.address else None
+            "email": self.email,
+            "address": self.address
         }
 
     @classmethod
     def from_dict(cls, data):
         record = cls(data["name"])
 
-        for phone_number in data.get("phones", []):
-            record.add_phone(phone_number)
+        # Номери у файлі вже пройшли валідацію під час додавання
+        record.phones = list(data.get("phones", []))
+        for phone_number in record.phones:
+            record._index_phone(phone_number)
 
         if data.get("birthday"):
             record.add_birthday(Birthday.from_dict(data["birthday"]))
 
-        if data.get("email"):
-            record.set_email(data["email"])
+        # Email і адресу так само перевірили при додаванні,
+        # тож regex не повторюємо
+        record.email = data.get("email") or None
+        record.address = data.get("address") or None
 
-        if data.get("address"):
-            record.set_address(data["address"])
+        return record
 
+
+# Скільки днів додати, щоб перенести привітання з вихідних на понеділок
+_WEEKEND_SHIFT = (0, 0, 0, 0, 0, 2, 1)
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class AddressBook(dict):
+    # Наслідуємо dict напряму: записи лежать у самій книзі,
+    # без обгортки UserDict
+    __slots__ = (
+        "_by_gram", "_grams", "_order", "_counter", "_birthdays", "_bday_keys",
+    )
+
+    def __init__(self):
+        super().__init__()
+        # Індекс триграм для search: триграма -> імена контактів;
+        # будується лише при першому пошуку, щоб не гальмувати старт
+        self._by_gram = None
+        self._grams = {}  # ім'я -> триграми, під якими записано контакт
+        # ім'я -> порядковий номер, щоб зберегти порядок видачі
+        self._order = {}
+        self._counter = count()
+        # Відсортовані (місяць, день, порядковий номер, ім'я)
+        # для get_upcoming_birthdays
+        self._birthdays = []
+        self._bday_keys = {}  # ім'я -> ключ контакту в self._birthdays
+
+    # Усі зміни вмісту книги (add_record, delete, []=, del, pop, popitem,
+    # setdefault, update, |=, clear) проходять через __setitem__/__delitem__,
+    # щоб індекси не розходились із записами. copy() і | успадковані від dict
+    # і повертають звичайний dict без індексів
+
+    def __setitem__(self, name, record):
+        # Перевіряємо до будь-яких змін, щоб у книзі не лишився "битий" ключ
+        if not isinstance(record, Record):
+            raise TypeError("AddressBook values must be Record, "
+                            f"not {type(record).__name__}")
+        old = self.get(name)
+        if old is not None:
+            old._book = None
+        else:
+            self._order[name] = next(self._counter)
+        super().__setitem__(name, record)
+        record._book = self
+        record._key = name
+        self._reindex(record)
+
+    def __delitem__(self, name):
+        record = self[name]
+        self._unindex(name)
+        del self._order[name]
+        super().__delitem__(name)
+        record._book = None
+
+    def pop(self, name, *default):
+        if name not in self:
+            return super().pop(name, *default)
+        record = self[name]
+        del self[name]
         return record
 
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        name = next(reversed(self))
+        return name, self.pop(name)
+
+    def setdefault(self, name, record=None):
+        if name not in self:
+            self[name] = record
+        return self[name]
+
+    def update(self, other=(), **kwargs):
+        for name, record in dict(other, **kwargs).items():
+            self[name] = record
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        for record in self.values():
+            record._book = None
+        super().clear()
+        self._by_gram = None
+        self._grams.clear()
+        self._order.clear()
+        self._birthdays.clear()
+        self._bday_keys.clear()
 
-class AddressBook(UserDict):
     def add_record(self, record: Record):
-        self.data[record.name.value] = record
+        self[record.name.value] = record
 
     def find(self, name):
-        return self.data.get(name)
+        return self.get(name)
 
     def delete(self, name):
-        if name in self.data:
-            del self.data[name]
+        if name in self:
+            del self[name]
+
+    def _reindex(self, record):
+        name = record._key
+        self._unindex(name)
+        if self._by_gram is not None:
+            self._index_grams(name, record)
+        if record.birthday:
+            key = (*record.birthday._month_day, self._order[name], name)
+            insort(self._birthdays, key)
+            self._bday_keys[name] = key
+
+    def _index_grams(self, name, record):
+        grams = _trigrams(record._search_text())
+        self._grams[name] = grams
+        for gram in grams:
+            self._by_gram[gram].add(name)
+
+    def _unindex(self, name):
+        for gram in self._grams.pop(name, ()):
+            names = self._by_gram[gram]
+            names.discard(name)
+            if not names:
+                del self._by_gram[gram]
+        key = self._bday_keys.pop(name, None)
+        if key is not None:
+            del self._birthdays[bisect_left(self._birthdays, key)]
+
+    def _candidates(self, q):
+        """Контакти, що можуть містити q; для коротких запитів — усі"""
+        if len(q) < 3:
+            return self.values()
+        if self._by_gram is None:
+            self._by_gram = defaultdict(set)
+            for name, record in self.items():
+                self._index_grams(name, record)
+        names = None
+        for gram in _trigrams(q):
+            posting = self._by_gram.get(gram)
+            if not posting:
+                return []
+            names = posting if names is None else names & posting
+        ordered = sorted(names, key=self._order.__getitem__)
+        return [self[name] for name in ordered]
 
     def get_upcoming_birthdays(self, days=7):
-        today = datetime.today().date()
-        upcoming_birthdays = []
+        # Усе, що не залежить від запису, рахуємо один раз до циклу
+        today = date.today()
+        cur_year = today.year
+        today_ord = today.toordinal()
+
+        # Вікно [сьогодні, сьогодні + days] у межах поточного року як діапазон
+        # (місяць, день): відсортований індекс дає лише потрібні записи
+        start_key = (today.month, today.day)
+        if start_key == (3, 1) and not isleap(cur_year):
+            start_key = (2, 29)  # 29.02 у невисокосний рік святкуємо 01.03
+        if days >= date(cur_year, 12, 31).toordinal() - today_ord:
+            end_key = (12, 31)
+        else:
+            end = date.fromordinal(today_ord + days)
+            end_key = (end.month, end.day)
+        lo = bisect_left(self._birthdays, start_key)
+        hi = bisect_right(self._birthdays, (*end_key, float("inf")))
 
-        for record in self.data.values():
-            if record.birthday:
-                bday = record.birthday.value
-                birthday_this_year = bday.replace(year=today.year)
-
-                delta_days = (birthday_this_year - today).days
-
-                if 0 <= delta_days <= days:
-                    congratulation_date = birthday_this_year
-                    if congratulation_date.weekday() >= 5:
-                        days_to_monday = 7 - congratulation_date.weekday()
-                        congratulation_date += timedelta(days=days_to_monday)
-
-                    con_date_str = congratulation_date.strftime("%d.%m.%Y")
-                    upcoming_birthdays.append(
-                        {
-                            "name": record.name.value,
-                            "congratulation_date": con_date_str,
-                        }
-                    )
+        upcoming_birthdays = []
+        # У вікні лише кілька різних (місяць, день): дату привітання для
+        # кожного рахуємо один раз, а не для кожного контакту
+        congratulations = {}
+        # Сортуємо за порядковим номером, щоб зберегти порядок контактів
+        hits = sorted(self._birthdays[lo:hi], key=itemgetter(2))
+        for month, day, _, name in hits:
+            congratulation = congratulations.get((month, day))
+            if congratulation is None:
+                birthday_this_year = self[name].birthday.this_year(cur_year)
+                congratulation = _format_date(birthday_this_year + timedelta(
+                    days=_WEEKEND_SHIFT[birthday_this_year.weekday()]
+                ))
+                congratulations[month, day] = congratulation
+            upcoming_birthdays.append(
+                {
+                    "name": name,
+                    "congratulation_date": congratulation,
+                }
+            )
         return upcoming_birthdays
 
     def search(self, query):
         """Пошук контактів по імені, телефону, email, адресі"""
         q = str(query).lower()
-        results = []
-
-        for rec in self.data.values():
-            # Пошук по імені
-            if q in rec.name.value.lower():
-                results.append(rec)
-                continue
-
-            # Пошук по email
-            if rec.email and q in rec.email.value.lower():
-                results.append(rec)
-                continue
-
-            # Пошук по адресі
-            if rec.address and q in rec.address.value.lower():
-                results.append(rec)
-                continue
-
-            # Пошук по телефонах
-            for p in rec.phones:
-                if q in p.value:
-                    results.append(rec)
-                    break
-
-        return results
+        return [rec for rec in self._candidates(q) if q in rec._search_text()]
 
     def to_dict(self):
-        return {name: record.to_dict() for name, record in self.data.items()}
+        return {name: record.to_dict() for name, record in self.items()}
 
     @classmethod
     def from_dict(cls, data):
         book = cls()
-        for name, record_dict in data.items():
+        for record_dict in data.values():
             record = Record.from_dict(record_dict)
-            book.add_record(record)
+            name = record.name.value
+            # Масове завантаження: без insort на кожен запис,
+            # індекс сортуємо один раз
+            old = book.get(name)
+            if old is None:
+                book._order[name] = next(book._counter)
+            else:
+                old._book = None
+                old_key = book._bday_keys.pop(name, None)
+                if old_key is not None:
+                    book._birthdays.remove(old_key)
+            order = book._order[name]
+            dict.__setitem__(book, name, record)
+            record._book = book
+            record._key = name
+            if record.birthday:
+                key = (*record.birthday._month_day, order, name)
+                book._birthdays.append(key)
+                book._bday_keys[name] = key
+        book._birthdays.sort()
         return book
\ No newline at end of file
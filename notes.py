@@ -1,39 +1,68 @@
 from datetime import datetime
-from collections import UserDict
 import json
 
 
+_CREATED_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _format_created(value):
+    """YYYY-MM-DD HH:MM:SS без strftime"""
+    return (f"{value.year:04d}-{value.month:02d}-{value.day:02d} "
+            f"{value.hour:02d}:{value.minute:02d}:{value.second:02d}")
+
+
+def _parse_created(value):
+    """Розібрати YYYY-MM-DD HH:MM:SS; канонічний запис — без strptime"""
+    digits = (value[:4] + value[5:7] + value[8:10]
+              + value[11:13] + value[14:16] + value[17:])
+    if (len(value) == 19 and value[4] == value[7] == '-' and value[10] == ' '
+            and value[13] == value[16] == ':'
+            and digits.isascii() and digits.isdigit()):
+        return datetime(int(value[:4]), int(value[5:7]), int(value[8:10]),
+                        int(value[11:13]), int(value[14:16]), int(value[17:]))
+    return datetime.strptime(value, _CREATED_FORMAT)
+
+
 class Note:
+    __slots__ = ("text", "tags", "id", "created", "_search_blob")
+
     def __init__(self, text, tags=None):
         if tags is None:
-            self.tags = self.extract_tags(text)
-            self.text = self.extract_text(text)
+            self.text, self.tags = self.extract_text_and_tags(text)
         else:
             self.text = text
             self.tags = tags
         self.id = None
         self.created = datetime.now()
+        # текст і теги для find_notes, скидається при редагуванні
+        self._search_blob = None
 
     def __str__(self):
         tags_str = ', '.join(self.tags) if self.tags else "No tags"
         return (f"ID: {self.id}\n"
-                f"Date: {self.created.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Date: {_format_created(self.created)}\n"
                 f"Tags: {tags_str}\n"
                 f"Text: {self.text}\n")
 
-    def extract_text(self, text):
-        words = text.split()
-        return ' '.join([word for word in words if not word.startswith('#')])
+    def _search_text(self):
+        """Текст і теги одним рядком у нижньому регістрі для find_notes"""
+        if self._search_blob is None:
+            self._search_blob = "\x1f".join([self.text, *self.tags]).lower()
+        return self._search_blob
 
-    def extract_tags(self, text):
-        words = text.split()
-        return [word.strip() for word in words if word.startswith('#')]
+    def extract_text_and_tags(self, text):
+        """Розділити текст на слова і теги (#слово) за один прохід"""
+        words = []
+        tags = []
+        for word in text.split():
+            (tags if word.startswith('#') else words).append(word)
+        return ' '.join(words), tags
 
     def to_dict(self):
         return {
             "id": self.id,
             "text": self.text,
-            "created": self.created.strftime('%Y-%m-%d %H:%M:%S'),
+            "created": _format_created(self.created),
             "tags": self.tags
         }
 
@@ -41,47 +70,46 @@ class Note:
     def from_dict(cls, data):
         note = cls(data["text"], data["tags"])
         note.id = data["id"]
-        note.created = datetime.strptime(data["created"], '%Y-%m-%d %H:%M:%S')
+        note.created = _parse_created(data["created"])
         return note
 
 
-class NoteBook(UserDict):
+class NoteBook(dict):
+    __slots__ = ("next_id",)
+
     def __init__(self):
         super().__init__()
         self.next_id = 1
 
     def add_note(self, note: Note):
         note.id = self.next_id
-        self.data[self.next_id] = note
+        self[self.next_id] = note
         self.next_id += 1
         return f"Note with ID {note.id} added."
 
     def find_notes(self, search_text):
-        found_notes = []
         search_text = search_text.lower()
-        for note in self.data.values():
-            if search_text in note.text.lower() \
-               or any(search_text in tag.lower() for tag in note.tags):
-                found_notes.append(note)
-        return found_notes
+        return [note for note in self.values()
+                if search_text in note._search_text()]
 
     def edit_note(self, note_id, new_text):
-        if note_id in self.data:
-            self.data[note_id].text = self.data[note_id].extract_text(new_text)
-            self.data[note_id].tags = self.data[note_id].extract_tags(new_text)
+        if note_id in self:
+            note = self[note_id]
+            note.text, note.tags = note.extract_text_and_tags(new_text)
+            note._search_blob = None
             return f"Note with ID {note_id} updated."
         raise KeyError(f"Note with ID {note_id} not found.")
 
     def delete_note(self, note_id):
-        if note_id in self.data:
-            del self.data[note_id]
+        if note_id in self:
+            del self[note_id]
             return f"Note with ID {note_id} deleted."
         raise KeyError(f"Note with ID {note_id} not found.")
 
     def to_dict(self):
         return {
             "next_id": self.next_id,
-            "notes": {str(k): v.to_dict() for k, v in self.data.items()}
+            "notes": {str(k): v.to_dict() for k, v in self.items()}
         }
 
     @classmethod
@@ -91,5 +119,34 @@ class NoteBook(UserDict):
         notes_data = data.get("notes", {})
         for note_id_str, note_dict in notes_data.items():
             note = Note.from_dict(note_dict)
-            notebook.data[int(note_id_str)] = note
-        return notebook
\ No newline at end of file
+            notebook[int(note_id_str)] = note
+        return notebook
+
+
+class LazyNoteBook:
+    """NoteBook, що будується з даних файлу лише при першому зверненні"""
+    __slots__ = ("_data", "_notebook")
+
+    def __init__(self, data):
+        self._data = data
+        self._notebook = None
+
+    def _load(self):
+        if self._notebook is None:
+            self._notebook = NoteBook.from_dict(self._data)
+            self._data = None
+        return self._notebook
+
+    def __len__(self):
+        return len(self._load())
+
+    def unwrap(self):
+        """Сирі дані, якщо нотатки не відкривали, інакше сам NoteBook"""
+        return self._data if self._notebook is None else self._notebook
+
+    def __getattr__(self, name):
+        # Службові імена не делегуємо: до ініціалізації слотів (copy, pickle)
+        # self._load() знову потрапив би сюди і зациклився
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
\ No newline at end of file